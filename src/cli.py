@@ -3,7 +3,7 @@ import click
 import json
 from datetime import datetime
 from .db import get_connection, init
-from .llm import call_ollama
+from .llm import call_ollama, gen_chat_batch
 from .srs import update_box, calculate_next_review
 from .chat import start_session
 
@@ -12,6 +12,8 @@ def cli(args=None):
     """VocabCLI - A terminal-based Spanish vocabulary coach."""
     pass
 
+cli.add_command(gen_chat_batch)
+
 @cli.command()
 def init_db():
     """Initialize the database and create tables."""
@@ -5,6 +5,12 @@ import click
 from pathlib import Path
 import yaml
 import re
+import glob
+import hashlib
+import os
+import time
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Load configuration
 CONFIG_PATH = Path(__file__).parent.parent / "config.yaml"
@@ -16,12 +22,13 @@ OLLAMA_MODEL = cfg.get("ollama_model", "llama3.2:latest")
 class OllamaError(Exception):
     pass
 
-def parse_ollama_response(text: str) -> dict:
+def parse_ollama_response(text: str, verbose: bool = True) -> dict:
     """Parse the Ollama response into a structured dictionary."""
     # Print the raw response for debugging
-    print("Raw Ollama response:")
-    print(text)
-    print("---")
+    if verbose:
+        print("Raw Ollama response:")
+        print(text)
+        print("---")
     
     result = {
         'translation': '',
@@ -83,23 +90,27 @@ def parse_ollama_response(text: str) -> dict:
             break
     
     # Print the parsed result for debugging
-    print("Parsed result:")
-    print(json.dumps(result, indent=2))
-    print("---")
+    if verbose:
+        print("Parsed result:")
+        print(json.dumps(result, indent=2))
+        print("---")
     
     return result
 
-def call_ollama(prompt: str, timeout: int = 60) -> dict:
+def call_ollama(prompt: str, timeout: int = 60, model: Optional[str] = None,
+                verbose: bool = True, detach: bool = False) -> dict:
     """
     Call the local Ollama LLaMA model with a given prompt and return parsed data.
+    With detach, the call runs in its own session so a terminal Ctrl-C does not kill it.
     """
     try:
         result = subprocess.run(
-            ["ollama", "run", OLLAMA_MODEL, prompt],
+            ["ollama", "run", model or OLLAMA_MODEL, prompt],
             capture_output=True,
             text=True,
             timeout=timeout,
-            check=True
+            check=True,
+            start_new_session=detach
         )
     except subprocess.CalledProcessError as e:
         raise OllamaError(f"Model call failed: {e.stderr.strip()}")
@@ -107,7 +118,7 @@ def call_ollama(prompt: str, timeout: int = 60) -> dict:
         raise OllamaError("Ollama call timed out")
 
     # Parse the response and add the raw response
-    parsed = parse_ollama_response(result.stdout)
+    parsed = parse_ollama_response(result.stdout, verbose=verbose)
     parsed['raw_response'] = result.stdout
     return parsed
 
@@ -163,5 +174,166 @@ def gen_chat(session_file):
     except OllamaError as e:
         click.echo(f"Error: {e}", err=True)
 
+def collect_templates(sources) -> list:
+    """
+    Expand template directories, glob patterns and files into a sorted list of paths.
+    Hidden files are skipped and sources that match nothing are reported.
+    """
+    templates = set()
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            matches = [p for p in path.iterdir() if p.is_file()]
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = [Path(p) for p in glob.glob(source, recursive=True)
+                       if Path(p).is_file()]
+        matches = [p for p in matches if not p.name.startswith('.')]
+        if not matches:
+            click.echo(f"Warning: no template files match '{source}'", err=True)
+        templates.update(p.resolve() for p in matches)
+    return sorted(templates)
+
+def template_hash(template: Path) -> Optional[str]:
+    """
+    Return a SHA-256 digest of a template's contents, or None if it cannot be read.
+    """
+    try:
+        return hashlib.sha256(template.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+def load_checkpoint(output_file: Path) -> set:
+    """
+    Return the (template, template_hash, model) keys that already succeeded
+    in a JSONL results file.
+    """
+    done = set()
+    if not output_file.exists():
+        return done
+    with open(output_file, 'rb') as f:
+        for line in f:
+            try:
+                record = json.loads(line.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                # Skip a line truncated by an interrupted run
+                continue
+            if not isinstance(record, dict) or record.get('error') is not None:
+                continue
+            key = (record.get('template'), record.get('template_hash'), record.get('model'))
+            if None not in key:
+                done.add(key)
+    return done
+
+def run_template(template: Path, digest: Optional[str], model: str, timeout: int) -> dict:
+    """
+    Run a single prompt template against a model and return a result record.
+    """
+    record = {'template': str(template), 'template_hash': digest, 'model': model}
+    start = time.perf_counter()
+    try:
+        prompt = template.read_text(encoding='utf-8')
+        data = call_ollama(prompt, timeout=timeout, model=model, verbose=False,
+                           detach=True)
+    except (OllamaError, OSError, UnicodeDecodeError) as e:
+        record.update(latency=round(time.perf_counter() - start, 3),
+                      output_length=0, parsed=None, raw_response=None,
+                      error=str(e))
+        return record
+
+    raw = data.pop('raw_response')
+    record.update(latency=round(time.perf_counter() - start, 3),
+                  output_length=len(raw), parsed=data, raw_response=raw,
+                  error=None)
+    return record
+
+def open_results(output_file: Path):
+    """
+    Open a JSONL results file for appending, terminating a truncated last line first.
+    """
+    # Check the last byte in binary mode; it may sit inside a multibyte character
+    if output_file.exists() and output_file.stat().st_size > 0:
+        with open(output_file, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+        if last != b'\n':
+            with open(output_file, 'ab') as f:
+                f.write(b'\n')
+    return open(output_file, 'a', encoding='utf-8')
+
+@cli.command()
+@click.argument('templates', nargs=-1, required=True)
+@click.option('--model', '-m', 'models', multiple=True,
+              help='Model to evaluate (repeatable). Defaults to the configured model.')
+@click.option('--output', '-o', type=click.Path(dir_okay=False), required=True,
+              help='JSONL file that results are appended to.')
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=4,
+              help='Number of concurrent Ollama calls.')
+@click.option('--timeout', type=click.IntRange(min=1), default=60,
+              help='Per-call timeout in seconds.')
+@click.option('--resume/--no-resume', default=True,
+              help='Skip template/model pairs that already succeeded in the output file.')
+def gen_chat_batch(templates, models, output, workers, timeout, resume):
+    """Run prompt templates (files, directories or globs) against several models."""
+    template_paths = collect_templates(templates)
+    if not template_paths:
+        raise click.ClickException("no template files found")
+    models = models or (OLLAMA_MODEL,)
+
+    output_file = Path(output)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    done = load_checkpoint(output_file) if resume else set()
+    digests = {t: template_hash(t) for t in template_paths}
+    jobs = [(t, m) for t in template_paths for m in models
+            if (str(t), digests[t], m) not in done]
+    skipped = len(template_paths) * len(models) - len(jobs)
+    click.echo(f"Running {len(jobs)} jobs with {workers} workers "
+               f"({skipped} already completed)")
+
+    failures = 0
+    completed = 0
+
+    def record_result(future):
+        nonlocal failures, completed
+        record = future.result()
+        # Results are only written from this thread, so lines never interleave
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        out.flush()
+        completed += 1
+        status = "ok" if record['error'] is None else f"error: {record['error']}"
+        if record['error'] is not None:
+            failures += 1
+        click.echo(f"[{completed}/{len(jobs)}] {record['template']} ({record['model']}) "
+                   f"{record['latency']:.2f}s {status}")
+
+    with open_results(output_file) as out:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        pending = {pool.submit(run_template, t, digests[t], m, timeout) for t, m in jobs}
+        try:
+            for future in as_completed(list(pending)):
+                pending.discard(future)
+                record_result(future)
+        except KeyboardInterrupt:
+            # Drop queued jobs but keep the results of calls already in flight
+            click.echo("Interrupted, waiting for running jobs to finish...", err=True)
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+            for future in pending:
+                if future.cancelled():
+                    continue
+                try:
+                    record_result(future)
+                except Exception as e:
+                    click.echo(f"Error: could not record interrupted job: {e}", err=True)
+            raise click.Abort()
+        finally:
+            pool.shutdown(wait=False)
+
+    click.echo(f"Done: {len(jobs) - failures} succeeded, {failures} failed")
+    if failures:
+        raise click.ClickException(f"{failures} of {len(jobs)} jobs failed")
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file